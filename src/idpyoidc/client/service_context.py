@@ -4,6 +4,7 @@ common between all the services that are used by OAuth2 client or OpenID Connect
 """
 import hashlib
 import logging
+from functools import lru_cache
 from typing import Callable
 from typing import Optional
 from typing import Union
@@ -76,6 +77,18 @@ DEFAULT_VALUE = {
 }
 
 
+@lru_cache(maxsize=1024)
+def _filename_from_webname(base_url, webname):
+    if not webname.startswith(base_url):
+        raise ValueError("Webname doesn't match base_url")
+
+    _name = webname[len(base_url) :]
+    if _name.startswith("/"):
+        return _name[1:]
+
+    return _name
+
+
 class ServiceContext(ImpExp):
     """
     This class keeps information that a client needs to be able to talk
@@ -197,14 +210,7 @@ class ServiceContext(ImpExp):
         :param webname: The published URL
         :return: local filename
         """
-        if not webname.startswith(self.base_url):
-            raise ValueError("Webname doesn't match base_url")
-
-        _name = webname[len(self.base_url) :]
-        if _name.startswith("/"):
-            return _name[1:]
-
-        return _name
+        return _filename_from_webname(self.base_url, webname)
 
     def import_keys(self, keyspec):
         """
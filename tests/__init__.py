@@ -20,3 +20,26 @@ CRYPT_CONFIG = {
 }
 
 SESSION_PARAMS = {"encrypter": CRYPT_CONFIG}
+
+CLIENT_AUTHN_KEYDEFS = [
+    {"type": "RSA", "key": "", "use": ["sig"]},
+    {"type": "EC", "crv": "P-256", "use": ["sig"]},
+]
+CLIENT_AUTHN_SERVER_JWKS = "private/client_authn_jwks.json"
+CLIENT_AUTHN_CLIENT_JWKS = "private/client_authn_client_jwks.json"
+
+SERVICE_CONTEXT_KEYDEFS = [
+    {"type": "EC", "crv": "P-256", "use": ["sig"]},
+    {"type": "EC", "crv": "P-256", "use": ["enc"]},
+]
+SERVICE_CONTEXT_JWKS = "private/service_context_jwks.json"
+
+# Key files that test modules load with read_only=True. conftest.py writes them
+# once on the pytest-xdist controller, so the workers only read them. Modules
+# that still call init_key_jar() with read_only=False write their own files and
+# are not covered; a key file they share must be added here before using -n.
+PRIMED_KEY_FILES = {
+    CLIENT_AUTHN_SERVER_JWKS: CLIENT_AUTHN_KEYDEFS,
+    CLIENT_AUTHN_CLIENT_JWKS: CLIENT_AUTHN_KEYDEFS,
+    SERVICE_CONTEXT_JWKS: SERVICE_CONTEXT_KEYDEFS,
+}
@@ -0,0 +1,13 @@
+from cryptojwt.key_jar import init_key_jar
+
+from tests import PRIMED_KEY_FILES
+
+
+def pytest_configure(config):
+    # Only the controller (or a plain run) writes the key files, the xdist
+    # workers importing the test modules then just read them back.
+    if hasattr(config, "workerinput"):
+        return
+
+    for path, key_defs in PRIMED_KEY_FILES.items():
+        init_key_jar(key_defs=key_defs, private_path=path, read_only=False)
@@ -1,83 +1,112 @@
+import copy
+
 import pytest
-from cryptojwt.key_jar import build_keyjar
 
 from idpyoidc.client.service_context import ServiceContext
 from idpyoidc.node import Unit
+from tests import SERVICE_CONTEXT_JWKS
+from tests import SERVICE_CONTEXT_KEYDEFS
 
-KEYDEFS = [
-    {"type": "RSA", "key": "", "use": ["sig"]},
-    {"type": "EC", "crv": "P-256", "use": ["sig"]},
-]
-
-KEYJAR = build_keyjar(KEYDEFS)
+KEYDEFS = SERVICE_CONTEXT_KEYDEFS
 
 MINI_CONFIG = {
     "base_url": "https://example.com/cli",
-    "key_conf": {"key_defs": KEYDEFS},
+    "key_conf": {
+        "key_defs": KEYDEFS,
+        "private_path": SERVICE_CONTEXT_JWKS,
+        "read_only": True,
+    },
     "issuer": "https://op.example.com",
     "preference": {"response_types": ["code"]},
 }
 
+UNIT = Unit()
+
+
+@pytest.fixture(scope="class")
+def service_context():
+    return ServiceContext(
+        config=MINI_CONFIG, upstream_get=UNIT.unit_get, base_url="https://example.com/cli"
+    )
+
+
+@pytest.fixture
+def mutable_service_context(service_context):
+    # Key material can't be deep copied so only snapshot what the tests modify
+    _prefer = service_context.claims.prefer.copy()
+    _provider_info = service_context.provider_info.copy()
+    yield service_context
+    service_context.claims.prefer = _prefer
+    service_context.provider_info = _provider_info
+
 
 class TestServiceContext:
-    @pytest.fixture(autouse=True)
-    def setup(self):
-        self.unit = Unit()
-        self.service_context = ServiceContext(
-            config=MINI_CONFIG, upstream_get=self.unit.unit_get, base_url="https://example.com/cli"
-        )
-
-    def test_init(self):
-        assert self.service_context
-
-    def test_filename_from_webname(self):
-        _filename = self.service_context.filename_from_webname("https://example.com/cli/jwks.json")
+    def test_init(self, service_context):
+        assert service_context
+
+    def test_filename_from_webname(self, service_context):
+        _filename = service_context.filename_from_webname("https://example.com/cli/jwks.json")
         assert _filename == "jwks.json"
 
-    def test_get_sign_alg(self):
-        _alg = self.service_context.get_sign_alg("id_token")
-        assert _alg is None
-
-        self.service_context.claims.set_preference("id_token_signed_response_alg", "RS384")
-        _alg = self.service_context.get_sign_alg("id_token")
-        assert _alg == "RS384"
-
-        self.service_context.claims.prefer = {}
-        self.service_context.provider_info["id_token_signing_alg_values_supported"] = [
-            "RS256",
-            "ES256",
-        ]
-        _alg = self.service_context.get_sign_alg("id_token")
-        assert _alg == ["RS256", "ES256"]
-
-    def test_get_enc_alg_enc(self):
-        _alg_enc = self.service_context.get_enc_alg_enc("userinfo")
-        assert _alg_enc == {"alg": None, "enc": None}
-
-        self.service_context.claims.set_preference("userinfo_encrypted_response_alg", "RSA1_5")
-        self.service_context.claims.set_preference(
-            "userinfo_encrypted_response_enc", "A128CBC+HS256"
-        )
-
-        _alg_enc = self.service_context.get_enc_alg_enc("userinfo")
-        assert _alg_enc == {"alg": "RSA1_5", "enc": "A128CBC+HS256"}
-
-        self.service_context.claims.prefer = {}
-        self.service_context.provider_info["userinfo_encryption_alg_values_supported"] = [
-            "RSA1_5",
-            "A128KW",
-        ]
-        self.service_context.provider_info["userinfo_encryption_enc_values_supported"] = [
-            "A128CBC+HS256",
-            "A128GCM",
-        ]
-
-        _alg_enc = self.service_context.get_enc_alg_enc("userinfo")
-        assert _alg_enc == {"alg": ["RSA1_5", "A128KW"], "enc": ["A128CBC+HS256", "A128GCM"]}
-
-    def test_get(self):
-        assert self.service_context.base_url == MINI_CONFIG["base_url"]
-
-    def test_set(self):
-        self.service_context.set_preference("client_id", "number5")
-        assert self.service_context.get_preference("client_id") == "number5"
+        with pytest.raises(ValueError):
+            service_context.filename_from_webname("https://example.org/cli/jwks.json")
+
+    @pytest.mark.parametrize(
+        "prefer, provider_info, expected",
+        [
+            ({}, {}, None),
+            ({"id_token_signed_response_alg": "RS384"}, {}, "RS384"),
+            (
+                {},
+                {"id_token_signing_alg_values_supported": ["RS256", "ES256"]},
+                ["RS256", "ES256"],
+            ),
+        ],
+    )
+    def test_get_sign_alg(self, mutable_service_context, prefer, provider_info, expected):
+        for key, val in prefer.items():
+            mutable_service_context.claims.set_preference(key, val)
+        mutable_service_context.provider_info.update(provider_info)
+
+        assert mutable_service_context.get_sign_alg("id_token") == expected
+
+    @pytest.mark.parametrize(
+        "prefer, provider_info, expected",
+        [
+            ({}, {}, {"alg": None, "enc": None}),
+            (
+                {
+                    "userinfo_encrypted_response_alg": "RSA1_5",
+                    "userinfo_encrypted_response_enc": "A128CBC+HS256",
+                },
+                {},
+                {"alg": "RSA1_5", "enc": "A128CBC+HS256"},
+            ),
+            (
+                {},
+                {
+                    "userinfo_encryption_alg_values_supported": ["RSA1_5", "A128KW"],
+                    "userinfo_encryption_enc_values_supported": ["A128CBC+HS256", "A128GCM"],
+                },
+                {"alg": ["RSA1_5", "A128KW"], "enc": ["A128CBC+HS256", "A128GCM"]},
+            ),
+        ],
+    )
+    def test_get_enc_alg_enc(self, mutable_service_context, prefer, provider_info, expected):
+        for key, val in prefer.items():
+            mutable_service_context.claims.set_preference(key, val)
+        mutable_service_context.provider_info.update(provider_info)
+
+        assert mutable_service_context.get_enc_alg_enc("userinfo") == expected
+
+    def test_get(self, service_context):
+        assert service_context.base_url == MINI_CONFIG["base_url"]
+
+    def test_set(self, mutable_service_context):
+        mutable_service_context.set_preference("client_id", "number5")
+        assert mutable_service_context.get_preference("client_id") == "number5"
+
+    def test_config_not_modified(self):
+        _config = copy.deepcopy(MINI_CONFIG)
+        ServiceContext(config=MINI_CONFIG, upstream_get=UNIT.unit_get)
+        assert MINI_CONFIG == _config
@@ -1,19 +1,16 @@
 import base64
+import copy
 from typing import Callable
 from typing import Optional
-from unittest.mock import MagicMock
 
 import pytest
 from cryptojwt.jws.exception import NoSuitableSigningKeys
 from cryptojwt.jwt import JWT
 from cryptojwt.key_jar import KeyJar
-from cryptojwt.key_jar import build_keyjar
-from cryptojwt.utils import as_bytes
-from cryptojwt.utils import as_unicode
+from cryptojwt.key_jar import init_key_jar
 
 from idpyoidc.defaults import JWT_BEARER
 from idpyoidc.server import Server
-from idpyoidc.server import do_endpoints
 from idpyoidc.server.client_authn import BearerBody
 from idpyoidc.server.client_authn import BearerHeader
 from idpyoidc.server.client_authn import ClientSecretBasic
@@ -22,19 +19,23 @@ from idpyoidc.server.client_authn import ClientSecretPost
 from idpyoidc.server.client_authn import JWSAuthnMethod
 from idpyoidc.server.client_authn import PrivateKeyJWT
 from idpyoidc.server.client_authn import basic_authn
+from idpyoidc.server.client_authn import client_auth_setup
 from idpyoidc.server.client_authn import verify_client
 from idpyoidc.server.endpoint import Endpoint
 from idpyoidc.server.exception import ClientAuthenticationError
 from idpyoidc.server.exception import InvalidToken
+from idpyoidc.server.session.claims import ClaimsInterface
+from tests import CLIENT_AUTHN_CLIENT_JWKS
+from tests import CLIENT_AUTHN_KEYDEFS
+from tests import CLIENT_AUTHN_SERVER_JWKS
 from tests import CRYPT_CONFIG
 from tests import SESSION_PARAMS
 
-KEYDEFS = [
-    {"type": "RSA", "key": "", "use": ["sig"]},
-    {"type": "EC", "crv": "P-256", "use": ["sig"]},
-]
+KEYDEFS = CLIENT_AUTHN_KEYDEFS
 
-KEYJAR = build_keyjar(KEYDEFS)
+# Written once by conftest.py, so the pytest-xdist workers only read the file
+KEYJAR = init_key_jar(key_defs=KEYDEFS, private_path=CLIENT_AUTHN_SERVER_JWKS, read_only=True)
+SERVER_PRIV_JWKS = KEYJAR.export_jwks(private=True)
 
 
 class Endpoint_1(Endpoint):
@@ -104,7 +105,7 @@ CONF = {
         "key_defs": KEYDEFS,
         "uri_path": "static/jwks.json",
     },
-    "claims_interface": {"class": "idpyoidc.server.session.claims.ClaimsInterface", "kwargs": {}},
+    "claims_interface": {"class": ClaimsInterface, "kwargs": {}},
     "session_params": SESSION_PARAMS,
     "token_handler_args": {
         "code": {"lifetime": 600, "kwargs": {"crypt_conf": CRYPT_CONFIG}},
@@ -115,9 +116,47 @@ CONF = {
 
 client_id = "client_id"
 client_secret = "a_longer_client_secret"
+
+
+def _b64s(s: str) -> str:
+    return base64.b64encode(s.encode("ascii")).decode("ascii")
+
+
+BASIC_TOKEN = _b64s("{}:{}".format(client_id, client_secret))
+BASIC_AUTHZ = "Basic {}".format(BASIC_TOKEN)
+# Right client_id, wrong client_secret
+BAD_BASIC_AUTHZ = "Basic {}".format(_b64s("{}:{}".format(client_id, "pillow")))
+
 # Need to add the client_secret as a symmetric key bound to the client_id
 KEYJAR.add_symmetric(client_id, client_secret, ["sig"])
 
+# Client side keys used with client_secret_jwt
+CLIENT_KEYJAR = KeyJar()
+CLIENT_KEYJAR.import_jwks(SERVER_PRIV_JWKS, CONF["issuer"])
+# The only own key the client has at this point
+CLIENT_KEYJAR.add_symmetric("", client_secret, ["sig"])
+
+# Client assertions signed with the client_secret, packed once per (aud, sign_alg, with_jti)
+_assertion_cache = {}
+
+
+def _make_assertion(aud, sign_alg="HS256", with_jti=False):
+    key = (aud, sign_alg, with_jti)
+    if key not in _assertion_cache:
+        _jwt = JWT(CLIENT_KEYJAR, iss=client_id, sign_alg=sign_alg)
+        _jwt.with_jti = with_jti
+        _assertion_cache[key] = _jwt.pack({"aud": [aud]})
+    return _assertion_cache[key]
+
+
+# Client side keys used with private_key_jwt
+CLIENT_KEYJAR_PRIV = init_key_jar(
+    key_defs=KEYDEFS, private_path=CLIENT_AUTHN_CLIENT_JWKS, read_only=True
+)
+CLIENT_KEYJAR_PRIV.import_jwks(SERVER_PRIV_JWKS, CONF["issuer"])
+# The server needs the client's public keys
+KEYJAR.import_jwks(CLIENT_KEYJAR_PRIV.export_jwks(), client_id)
+
 
 def get_client_id_from_token(context, token, request=None):
     if "client_id" in request:
@@ -126,23 +165,45 @@ def get_client_id_from_token(context, token, request=None):
     return ""
 
 
-class TestClientSecretBasic:
-    @pytest.fixture(autouse=True)
-    def setup(self):
-        server = Server(conf=CONF, keyjar=KEYJAR)
-        server.context.cdb[client_id] = {"client_secret": client_secret}
-        self.context = server.context
-        server.endpoint = do_endpoints(CONF, server.unit_get)
-        self.method = ClientSecretBasic(server.unit_get)
+def _static_client_id(*_):
+    return "client_id"
 
-    def test_client_secret_basic(self):
-        _token = "{}:{}".format(client_id, client_secret)
-        token = as_unicode(base64.b64encode(as_bytes(_token)))
 
-        authz_token = "Basic {}".format(token)
+@pytest.fixture(scope="module")
+def server():
+    return Server(conf=CONF, keyjar=KEYJAR)
+
+
+@pytest.fixture(scope="module")
+def endpoints(server):
+    return server.get_endpoints()
+
+
+@pytest.fixture(scope="module")
+def endpoint_full_paths(endpoints):
+    return {name: endpoint.full_path for name, endpoint in endpoints.items()}
+
 
-        assert self.method.is_usable(authorization_token=authz_token)
-        authn_info = self.method.verify(authorization_token=authz_token)
+@pytest.fixture(autouse=True)
+def reset_context(server):
+    _context = server.context
+    _context.cdb.clear()
+    _context.cdb[client_id] = {"client_secret": client_secret}
+    _context.registration_access_token.clear()
+    # Cached assertions carrying a jti are reused between tests
+    _context.jti_db.clear()
+
+
+class TestClientSecretBasic:
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def setup(cls, server):
+        cls.context = server.context
+        cls.method = ClientSecretBasic(server.unit_get)
+
+    def test_client_secret_basic(self):
+        assert self.method.is_usable(authorization_token=BASIC_AUTHZ)
+        authn_info = self.method.verify(authorization_token=BASIC_AUTHZ)
 
         assert authn_info["client_id"] == client_id
 
@@ -150,24 +211,18 @@ class TestClientSecretBasic:
         assert self.method.is_usable(authorization_token="Foppa toffel") is False
 
     def test_csb_wrong_secret(self):
-        _token = "{}:{}".format(client_id, "pillow")
-        token = as_unicode(base64.b64encode(as_bytes(_token)))
-
-        authz_token = "Basic {}".format(token)
-
-        assert self.method.is_usable(authorization_token=authz_token)
+        assert self.method.is_usable(authorization_token=BAD_BASIC_AUTHZ)
 
         with pytest.raises(ClientAuthenticationError):
-            self.method.verify(authorization_token=authz_token)
+            self.method.verify(authorization_token=BAD_BASIC_AUTHZ)
 
 
 class TestClientSecretPost:
-    @pytest.fixture(autouse=True)
-    def create_method(self):
-        server = Server(conf=CONF, keyjar=KEYJAR)
-        server.context.cdb[client_id] = {"client_secret": client_secret}
-        self.context = server.context
-        self.method = ClientSecretPost(server.unit_get)
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def create_method(cls, server):
+        cls.context = server.context
+        cls.method = ClientSecretPost(server.unit_get)
 
     def test_client_secret_post(self):
         request = {"client_id": client_id, "client_secret": client_secret}
@@ -184,23 +239,16 @@ class TestClientSecretPost:
             self.method.verify(request)
 
 
+@pytest.mark.jws
 class TestClientSecretJWT:
-    @pytest.fixture(autouse=True)
-    def create_method(self):
-        server = Server(conf=CONF, keyjar=KEYJAR)
-        server.context.cdb[client_id] = {"client_secret": client_secret}
-        self.context = server.context
-        self.method = ClientSecretJWT(server.unit_get)
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def create_method(cls, server):
+        cls.context = server.context
+        cls.method = ClientSecretJWT(server.unit_get)
 
     def test_client_secret_jwt(self):
-        client_keyjar = KeyJar()
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
-        # The only own key the client has at this point
-        client_keyjar.add_symmetric("", client_secret, ["sig"])
-
-        _jwt = JWT(client_keyjar, iss=client_id, sign_alg="HS256")
-        _jwt.with_jti = True
-        _assertion = _jwt.pack({"aud": [CONF["issuer"]]})
+        _assertion = _make_assertion(CONF["issuer"], with_jti=True)
 
         request = {"client_assertion": _assertion, "client_assertion_type": JWT_BEARER}
 
@@ -211,26 +259,17 @@ class TestClientSecretJWT:
         assert "jwt" in authn_info
 
 
+@pytest.mark.jws
 class TestPrivateKeyJWT:
-    @pytest.fixture(autouse=True)
-    def create_method(self):
-        server = Server(conf=CONF, keyjar=KEYJAR)
-        server.context.cdb[client_id] = {"client_secret": client_secret}
-        server.endpoint = do_endpoints(CONF, server.unit_get)
-        self.server = server
-        self.context = server.context
-        self.method = PrivateKeyJWT(server.unit_get)
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def create_method(cls, server, endpoints):
+        cls.endpoints = endpoints
+        cls.context = server.context
+        cls.method = PrivateKeyJWT(server.unit_get)
 
     def test_private_key_jwt(self):
-        # Own dynamic keys
-        client_keyjar = build_keyjar(KEYDEFS)
-        # The servers keys
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
-
-        _jwks = client_keyjar.export_jwks()
-        self.server.keyjar.import_jwks(_jwks, client_id)
-
-        _jwt = JWT(client_keyjar, iss=client_id, sign_alg="RS256")
+        _jwt = JWT(CLIENT_KEYJAR_PRIV, iss=client_id, sign_alg="RS256")
         _jwt.with_jti = True
         _assertion = _jwt.pack({"aud": [CONF["issuer"]]})
 
@@ -242,52 +281,36 @@ class TestPrivateKeyJWT:
         assert authn_info["client_id"] == client_id
         assert "jwt" in authn_info
 
-    def test_private_key_jwt_reusage_other_endpoint(self):
-        # Own dynamic keys
-        client_keyjar = build_keyjar(KEYDEFS)
-        # The servers keys
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
-
-        _jwks = client_keyjar.export_jwks()
-        self.server.keyjar.import_jwks(_jwks, client_id)
-
-        _jwt = JWT(client_keyjar, iss=client_id, sign_alg="RS256")
+    def test_private_key_jwt_reusage_other_endpoint(self, endpoint_full_paths):
+        _jwt = JWT(CLIENT_KEYJAR_PRIV, iss=client_id, sign_alg="RS256")
         _jwt.with_jti = True
-        _assertion = _jwt.pack({"aud": [self.server.get_endpoint("endpoint_1").full_path]})
+        _assertion = _jwt.pack({"aud": [endpoint_full_paths["endpoint_1"]]})
 
         request = {"client_assertion": _assertion, "client_assertion_type": JWT_BEARER}
 
         # This should be OK
         assert self.method.is_usable(request=request)
-        self.method.verify(request=request, endpoint=self.server.get_endpoint("endpoint_1"))
+        self.method.verify(request=request, endpoint=self.endpoints["endpoint_1"])
 
         # This should NOT be OK
         with pytest.raises(InvalidToken):
-            self.method.verify(request=request, endpoint=self.server.get_endpoint("authorization"))
+            self.method.verify(request=request, endpoint=self.endpoints.get("authorization"))
 
         # This should NOT be OK because this is the second time the token appears
         with pytest.raises(InvalidToken):
-            self.method.verify(request=request, endpoint=self.server.get_endpoint("endpoint_1"))
-
-    def test_private_key_jwt_auth_endpoint(self):
-        # Own dynamic keys
-        client_keyjar = build_keyjar(KEYDEFS)
-        # The servers keys
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
-
-        _jwks = client_keyjar.export_jwks()
-        self.server.keyjar.import_jwks(_jwks, client_id)
+            self.method.verify(request=request, endpoint=self.endpoints["endpoint_1"])
 
-        _jwt = JWT(client_keyjar, iss=client_id, sign_alg="RS256")
+    def test_private_key_jwt_auth_endpoint(self, endpoint_full_paths):
+        _jwt = JWT(CLIENT_KEYJAR_PRIV, iss=client_id, sign_alg="RS256")
         _jwt.with_jti = True
-        _assertion = _jwt.pack({"aud": [self.server.get_endpoint("endpoint_2").full_path]})
+        _assertion = _jwt.pack({"aud": [endpoint_full_paths["endpoint_2"]]})
 
         request = {"client_assertion": _assertion, "client_assertion_type": JWT_BEARER}
 
         assert self.method.is_usable(request=request)
         authn_info = self.method.verify(
             request=request,
-            endpoint=self.server.get_endpoint("endpoint_2"),
+            endpoint=self.endpoints["endpoint_2"],
         )
 
         assert authn_info["client_id"] == client_id
@@ -295,21 +318,17 @@ class TestPrivateKeyJWT:
 
 
 class TestBearerHeader:
-    @pytest.fixture(autouse=True)
-    def create_method(self):
-        server = Server(conf=CONF, keyjar=KEYJAR)
-        server.context.cdb[client_id] = {"client_secret": client_secret}
-        server.endpoint = do_endpoints(CONF, server.unit_get)
-        self.server = server
-        self.context = server.context
-        self.method = BearerHeader(server.unit_get)
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def create_method(cls, server):
+        cls.context = server.context
+        cls.method = BearerHeader(server.unit_get)
 
     def test_bearerheader(self):
         authorization_info = "Bearer 1234567890"
-        get_client_id_from_token = lambda *_: "client_id"
         assert self.method.verify(
             authorization_token=authorization_info,
-            get_client_id_from_token=get_client_id_from_token,
+            get_client_id_from_token=_static_client_id,
         ) == {"token": "1234567890", "method": "bearer_header", "client_id": "client_id"}
 
     def test_bearerheader_wrong_type(self):
@@ -318,14 +337,11 @@ class TestBearerHeader:
 
 
 class TestBearerBody:
-    @pytest.fixture(autouse=True)
-    def create_method(self):
-        server = Server(conf=CONF, keyjar=KEYJAR)
-        server.context.cdb[client_id] = {"client_secret": client_secret}
-        server.endpoint = do_endpoints(CONF, server.unit_get)
-        self.server = server
-        self.context = server.context
-        self.method = BearerBody(server.unit_get)
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def create_method(cls, server):
+        cls.context = server.context
+        cls.method = BearerBody(server.unit_get)
 
     def test_bearer_body(self):
         request = {"access_token": "1234567890"}
@@ -340,19 +356,18 @@ class TestBearerBody:
             self.method.verify(request=request)
 
 
+@pytest.mark.jws
 class TestJWSAuthnMethod:
-    @pytest.fixture(autouse=True)
-    def create_method(self):
-        server = Server(conf=CONF, keyjar=KEYJAR)
-        server.context.cdb[client_id] = {"client_secret": client_secret}
-        server.endpoint = do_endpoints(CONF, server.unit_get)
-        self.server = server
-        self.context = server.context
-        self.method = JWSAuthnMethod(server.unit_get)
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def create_method(cls, server, endpoints):
+        cls.endpoints = endpoints
+        cls.context = server.context
+        cls.method = JWSAuthnMethod(server.unit_get)
 
     def test_jws_authn_method_wrong_key(self):
         client_keyjar = KeyJar()
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
+        client_keyjar.import_jwks(SERVER_PRIV_JWKS, CONF["issuer"])
         # Fake symmetric key
         client_keyjar.add_symmetric("", "client_secret:client_secret", ["sig"])
 
@@ -364,93 +379,45 @@ class TestJWSAuthnMethod:
         with pytest.raises(NoSuitableSigningKeys):
             self.method.verify(request=request, key_type="private_key")
 
-    def test_jws_authn_method_aud_iss(self):
-        client_keyjar = KeyJar()
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
-        # The only own key the client has a this point
-        client_keyjar.add_symmetric("", client_secret, ["sig"])
-
-        _jwt = JWT(client_keyjar, iss=client_id, sign_alg="HS256")
-        # Audience is OP issuer ID
-        aud = CONF["issuer"]
-        _assertion = _jwt.pack({"aud": [aud]})
-
-        request = {"client_assertion": _assertion, "client_assertion_type": JWT_BEARER}
-
-        assert self.method.verify(request=request, key_type="client_secret")
-
-    def test_jws_authn_method_aud_token_endpoint(self):
-        client_keyjar = KeyJar()
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
-        # The only own key the client has a this point
-        client_keyjar.add_symmetric("", client_secret, ["sig"])
-
-        _jwt = JWT(client_keyjar, iss=client_id, sign_alg="HS256")
-
-        # audience is OP token endpoint - that's OK
-        aud = "{}token".format(CONF["issuer"])
-        _assertion = _jwt.pack({"aud": [aud]})
-
-        request = {"client_assertion": _assertion, "client_assertion_type": JWT_BEARER}
+    @pytest.mark.parametrize(
+        "aud, endpoint_name",
+        [
+            # Audience is OP issuer ID
+            (CONF["issuer"], None),
+            # audience is OP token endpoint - that's OK
+            ("{}token".format(CONF["issuer"]), "endpoint_1"),
+            # audience is the OP - not specifically the user info endpoint
+            (CONF["issuer"], "endpoint_3"),
+        ],
+    )
+    def test_jws_authn_method_aud(self, aud, endpoint_name):
+        request = {"client_assertion": _make_assertion(aud), "client_assertion_type": JWT_BEARER}
 
         assert self.method.verify(
             request=request,
-            endpoint=self.server.get_endpoint("endpoint_1"),
+            endpoint=self.endpoints.get(endpoint_name),
             key_type="client_secret",
         )
 
     def test_jws_authn_method_aud_not_me(self):
-        client_keyjar = KeyJar()
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
-        # The only own key the client has at this point
-        client_keyjar.add_symmetric("", client_secret, ["sig"])
-
-        _jwt = JWT(client_keyjar, iss=client_id, sign_alg="HS256")
-
         # Other audiences not OK
-        aud = "https://example.org"
-
-        _assertion = _jwt.pack({"aud": [aud]})
-
-        request = {"client_assertion": _assertion, "client_assertion_type": JWT_BEARER}
+        request = {
+            "client_assertion": _make_assertion("https://example.org"),
+            "client_assertion_type": JWT_BEARER,
+        }
 
         with pytest.raises(InvalidToken):
             self.method.verify(request=request, key_type="client_secret")
 
-    def test_jws_authn_method_aud_userinfo_endpoint(self):
-        client_keyjar = KeyJar()
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
-        # The only own key the client has a this point
-        client_keyjar.add_symmetric("", client_secret, ["sig"])
-
-        _jwt = JWT(client_keyjar, iss=client_id, sign_alg="HS256")
-
-        # audience is the OP - not specifically the user info endpoint
-        _assertion = _jwt.pack({"aud": [CONF["issuer"]]})
-
-        request = {"client_assertion": _assertion, "client_assertion_type": JWT_BEARER}
-
-        assert self.method.verify(
-            request=request,
-            endpoint=self.server.get_endpoint("endpoint_3"),
-            key_type="client_secret",
-        )
-
 
 def test_basic_auth():
-    _token = "{}:{}".format(client_id, client_secret)
-    token = as_unicode(base64.b64encode(as_bytes(_token)))
-
-    res = basic_authn("Basic {}".format(token))
+    res = basic_authn(BASIC_AUTHZ)
     assert res
 
 
 def test_basic_auth_wrong_label():
-    _token = "{}:{}".format(client_id, client_secret)
-    token = as_unicode(base64.b64encode(as_bytes(_token)))
-
     with pytest.raises(ClientAuthenticationError):
-        basic_authn("Expanded {}".format(token))
+        basic_authn("Expanded {}".format(BASIC_TOKEN))
 
 
 def test_basic_auth_wrong_token():
@@ -459,52 +426,49 @@ def test_basic_auth_wrong_token():
         basic_authn("Basic {}".format(_token))
 
     _token = "{}{}".format(client_id, client_secret)
-    token = as_unicode(base64.b64encode(as_bytes(_token)))
+    token = _b64s(_token)
     with pytest.raises(ValueError):
         basic_authn("Basic {}".format(token))
 
 
 class TestVerify:
-    @pytest.fixture(autouse=True)
-    def create_method(self):
-        self.server = Server(conf=CONF, keyjar=KEYJAR)
-        self.server.context.cdb[client_id] = {"client_secret": client_secret}
-        self.server.endpoint = do_endpoints(CONF, self.server.unit_get)
-        self.context = self.server.get_context()
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def create_method(cls, server, endpoints):
+        cls.endpoints = endpoints
+        cls.context = server.get_context()
 
     def test_verify_per_client(self):
-        self.server.context.cdb[client_id]["client_authn_method"] = ["public"]
+        self.context.cdb[client_id]["client_authn_method"] = ["public"]
 
         request = {"client_id": client_id}
         res = verify_client(
             request=request,
-            endpoint=self.server.get_endpoint("endpoint_4"),
+            endpoint=self.endpoints["endpoint_4"],
         )
         assert res == {"method": "public", "client_id": client_id}
 
     def test_verify_per_client_per_endpoint(self):
-        self.server.context.cdb[client_id]["registration_endpoint_client_authn_method"] = ["public"]
-        self.server.context.cdb[client_id]["token_endpoint_client_authn_method"] = [
-            "client_secret_post"
-        ]
+        self.context.cdb[client_id]["registration_endpoint_client_authn_method"] = ["public"]
+        self.context.cdb[client_id]["token_endpoint_client_authn_method"] = ["client_secret_post"]
 
         request = {"client_id": client_id}
         res = verify_client(
             request=request,
-            endpoint=self.server.get_endpoint("endpoint_4"),
+            endpoint=self.endpoints["endpoint_4"],
         )
         assert res == {"method": "public", "client_id": client_id}
 
         res = verify_client(
             request=request,
-            endpoint=self.server.get_endpoint("endpoint_1"),
+            endpoint=self.endpoints["endpoint_1"],
         )
         assert res == {}
 
         request = {"client_id": client_id, "client_secret": client_secret}
         res = verify_client(
             request=request,
-            endpoint=self.server.get_endpoint("endpoint_1"),
+            endpoint=self.endpoints["endpoint_1"],
         )
         assert set(res.keys()) == {"method", "client_id"}
         assert res["method"] == "client_secret_post"
@@ -513,28 +477,22 @@ class TestVerify:
         request = {"client_id": client_id, "client_secret": client_secret}
         res = verify_client(
             request=request,
-            endpoint=self.server.get_endpoint("endpoint_1"),
+            endpoint=self.endpoints["endpoint_1"],
         )
         assert set(res.keys()) == {"method", "client_id"}
         assert res["method"] == "client_secret_post"
 
     def test_verify_client_jws_authn_method(self):
-        client_keyjar = KeyJar()
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
-        # The only own key the client has a this point
-        client_keyjar.add_symmetric("", client_secret, ["sig"])
-
-        _jwt = JWT(client_keyjar, iss=client_id, sign_alg="HS256")
         # Audience is OP issuer ID
         aud = "{}token".format(CONF["issuer"])  # aud == Token endpoint
-        _assertion = _jwt.pack({"aud": [aud]})
+        _assertion = _make_assertion(aud)
 
         request = {"client_assertion": _assertion, "client_assertion_type": JWT_BEARER}
         http_info = {"headers": {}}
         res = verify_client(
             request=request,
             http_info=http_info,
-            endpoint=self.server.get_endpoint("endpoint_1"),
+            endpoint=self.endpoints["endpoint_1"],
         )
         assert res["method"] == "client_secret_jwt"
         assert res["client_id"] == "client_id"
@@ -545,21 +503,18 @@ class TestVerify:
         res = verify_client(
             request=request,
             get_client_id_from_token=get_client_id_from_token,
-            endpoint=self.server.get_endpoint("endpoint_3"),
+            endpoint=self.endpoints["endpoint_3"],
         )
         assert set(res.keys()) == {"token", "method", "client_id"}
         assert res["method"] == "bearer_body"
 
     def test_verify_client_client_secret_basic(self):
-        _token = "{}:{}".format(client_id, client_secret)
-        token = as_unicode(base64.b64encode(as_bytes(_token)))
-        authz_token = "Basic {}".format(token)
-        http_info = {"headers": {"authorization": authz_token}}
+        http_info = {"headers": {"authorization": BASIC_AUTHZ}}
 
         res = verify_client(
             request={},
             http_info=http_info,
-            endpoint=self.server.get_endpoint("endpoint_1"),
+            endpoint=self.endpoints["endpoint_1"],
         )
         assert set(res.keys()) == {"method", "client_id"}
         assert res["method"] == "client_secret_basic"
@@ -575,86 +530,7 @@ class TestVerify:
             request=request,
             http_info=http_info,
             get_client_id_from_token=get_client_id_from_token,
-            endpoint=self.server.get_endpoint("endpoint_2"),
-        )
-        assert set(res.keys()) == {"token", "method", "client_id"}
-        assert res["method"] == "bearer_header"
-
-
-class TestVerify2:
-    @pytest.fixture(autouse=True)
-    def create_method(self):
-        self.server = Server(conf=CONF, keyjar=KEYJAR)
-        self.server.context.cdb[client_id] = {"client_secret": client_secret}
-        self.server.endpoint = do_endpoints(CONF, self.server.unit_get)
-        self.context = self.server.get_context()
-
-    def test_verify_client_jws_authn_method(self):
-        client_keyjar = KeyJar()
-        client_keyjar.import_jwks(KEYJAR.export_jwks(private=True), CONF["issuer"])
-        # The only own key the client has a this point
-        client_keyjar.add_symmetric("", client_secret, ["sig"])
-
-        _jwt = JWT(client_keyjar, iss=client_id, sign_alg="HS256")
-        # Audience is OP issuer ID
-        aud = CONF["issuer"] + "token"
-        _assertion = _jwt.pack({"aud": [aud]})
-
-        request = {"client_assertion": _assertion, "client_assertion_type": JWT_BEARER}
-
-        res = verify_client(
-            request=request,
-            endpoint=self.server.get_endpoint("endpoint_1"),
-        )
-        assert res["method"] == "client_secret_jwt"
-        assert res["client_id"] == "client_id"
-
-    def test_verify_client_bearer_body(self):
-        request = {"access_token": "1234567890", "client_id": client_id}
-        self.context.registration_access_token["1234567890"] = client_id
-        res = verify_client(
-            request=request,
-            get_client_id_from_token=get_client_id_from_token,
-            endpoint=self.server.get_endpoint("endpoint_3"),
-        )
-        assert set(res.keys()) == {"token", "method", "client_id"}
-        assert res["method"] == "bearer_body"
-
-    def test_verify_client_client_secret_post(self):
-        request = {"client_id": client_id, "client_secret": client_secret}
-        res = verify_client(
-            request=request,
-            endpoint=self.server.get_endpoint("endpoint_1"),
-        )
-        assert set(res.keys()) == {"method", "client_id"}
-        assert res["method"] == "client_secret_post"
-
-    def test_verify_client_client_secret_basic(self):
-        _token = "{}:{}".format(client_id, client_secret)
-        token = as_unicode(base64.b64encode(as_bytes(_token)))
-        authz_token = "Basic {}".format(token)
-        http_info = {"headers": {"authorization": authz_token}}
-
-        res = verify_client(
-            request={},
-            http_info=http_info,
-            endpoint=self.server.get_endpoint("endpoint_1"),
-        )
-        assert set(res.keys()) == {"method", "client_id"}
-        assert res["method"] == "client_secret_basic"
-
-    def test_verify_client_bearer_header(self):
-        # A prerequisite for the get_client_id_from_token function
-        self.context.registration_access_token["1234567890"] = client_id
-
-        token = "Bearer 1234567890"
-        http_info = {"headers": {"authorization": token}}
-        request = {"client_id": client_id}
-        res = verify_client(
-            request=request,
-            http_info=http_info,
-            get_client_id_from_token=get_client_id_from_token,
-            endpoint=self.server.get_endpoint("endpoint_2"),
+            endpoint=self.endpoints["endpoint_2"],
         )
         assert set(res.keys()) == {"token", "method", "client_id"}
         assert res["method"] == "bearer_header"
@@ -664,7 +540,7 @@ class TestVerify2:
         request = {"client_id": client_id}
         res = verify_client(
             request=request,
-            endpoint=self.server.get_endpoint("endpoint_2"),
+            endpoint=self.endpoints["endpoint_2"],
         )
         assert res["method"] == "none"
         assert res["client_id"] == "client_id"
@@ -674,7 +550,7 @@ class TestVerify2:
         request = {"redirect_uris": ["https://example.com/cb"], "client_id": "client_id"}
         res = verify_client(
             request=request,
-            endpoint=self.server.get_endpoint("endpoint_4"),
+            endpoint=self.endpoints["endpoint_4"],
         )
         assert res == {"client_id": "client_id", "method": "public"}
 
@@ -683,28 +559,42 @@ class TestVerify2:
         request = {"redirect_uris": ["https://example.com/cb"]}
         res = verify_client(
             request=request,
-            endpoint=self.server.get_endpoint("endpoint_4"),
+            endpoint=self.endpoints["endpoint_4"],
         )
         assert res == {"client_id": None, "method": "none"}
 
 
-def test_client_auth_setup():
-    class Mock:
-        is_usable = MagicMock(return_value=True)
-        verify = MagicMock(return_value={"method": "custom", "client_id": client_id})
+def test_server_leaves_conf_untouched():
+    _conf = copy.deepcopy(CONF)
+    Server(conf=CONF, keyjar=KEYJAR)
+    assert CONF == _conf
+
+
+class _FakeAuthn:
+    __slots__ = ("calls",)
+    tag = "mock"
+
+    def __init__(self, upstream_get=None):
+        self.calls = {"is_usable": 0, "verify": 0}
+
+    def is_usable(self, **kwargs):
+        self.calls["is_usable"] += 1
+        return True
+
+    def verify(self, **kwargs):
+        self.calls["verify"] += 1
+        return {"method": "custom", "client_id": client_id}
+
 
-    mock = Mock()
-    mock.tag = "mock"
-    conf = dict(CONF)
-    conf["client_authn_methods"] = {"custom": MagicMock(return_value=mock)}
-    conf["endpoint"]["registration"]["kwargs"]["client_authn_method"] = ["custom"]
-    server = Server(conf=conf, keyjar=KEYJAR)
-    server.context.cdb[client_id] = {"client_secret": client_secret}
-    server.endpoint = do_endpoints(CONF, server.unit_get)
+def test_client_auth_setup(server, monkeypatch):
+    # Swap in a registry that includes the custom method, restored by monkeypatch afterwards
+    _methods = client_auth_setup(server.unit_get, {"custom": _FakeAuthn})
+    monkeypatch.setattr(server.context, "client_authn_methods", _methods)
+    _endpoint = server.get_endpoint("endpoint_4")
+    monkeypatch.setattr(_endpoint, "client_authn_method", ["custom"])
 
     request = {"redirect_uris": ["https://example.com/cb"]}
-    res = verify_client(request=request, endpoint=server.get_endpoint("endpoint_4"))
+    res = verify_client(request=request, endpoint=_endpoint)
 
     assert res == {"client_id": "client_id", "method": "custom"}
-    mock.is_usable.assert_called_once()
-    mock.verify.assert_called_once()
+    assert _methods["custom"].calls == {"is_usable": 1, "verify": 1}